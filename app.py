@@ -1,11 +1,10 @@
-import plotly.graph_objects as go
 from datetime import datetime
-import plotly.express as px
+from html import escape
+from itertools import chain
 import streamlit as st
 import pandas as pd
-import graphviz
-import tempfile
-import os
+import numpy as np
+from cpm_kernel import cpm_core
 
 st.set_page_config(
     page_title="Project Scheduler",
@@ -24,162 +23,179 @@ if 'tasks_df' not in st.session_state:
     }
     st.session_state.tasks_df = pd.DataFrame(sample_data)
 
+# Bumped whenever tasks_df is replaced wholesale (CSV import, clear) so the editor
+# remounts with the new data; otherwise its key stays stable across reruns
+if 'editor_rev' not in st.session_state:
+    st.session_state.editor_rev = 0
+
+@st.cache_data(show_spinner=False)
+def _normalize_tasks(df):
+    """Clean the raw editor/CSV table once before analysis. Returns a new frame with
+    stripped Activity names, int32 Duration (Days) and Dependencies as tuples of names
+    (tuples rather than lists so st.cache_data can hash the frame in downstream calls).
+    """
+    df = df.dropna(subset=['Activity'])
+    # split by comma (swallowing surrounding whitespace) in one vectorized pass, ignore empties
+    deps = df['Dependencies'].fillna('').astype(str).str.strip()
+    return pd.DataFrame({
+        'Activity': df['Activity'].astype(str).str.strip(),
+        'Duration (Days)': pd.to_numeric(df['Duration (Days)'].fillna(1), errors='coerce').astype(np.int32),
+        'Dependencies': deps.str.split(r'\s*,\s*', regex=True).map(lambda parts: tuple(p for p in parts if p)),
+    }, index=df.index)
+
+@st.cache_data(show_spinner=False)
 def calculate_cpm(df, start_date):
-    """Compute CPM using explicit topological sort (Kahn). Returns:
+    """Compute CPM using explicit topological sort (Kahn) on a frame prepared by
+    _normalize_tasks. Returns:
         (df_display, critical_path, df_with_datetimes)
     """
-    # Ensure inputs
-    df = df.copy()
-    df['Duration (Days)'] = pd.to_numeric(df['Duration (Days)'].fillna(1), errors='coerce').astype(int)
-    df['Dependencies'] = df['Dependencies'].fillna('')
-
-    # Normalize Activity names (strip) and Dependencies into lists (strip each)
-    df['Activity'] = df['Activity'].astype(str).str.strip()
-    def parse_deps(x):
-        if pd.isna(x) or str(x).strip() == '':
-            return []
-        # split by comma and strip each token, ignore empties
-        parts = [p.strip() for p in str(x).split(',')]
-        return [p for p in parts if p != '']
-    df['Dependencies'] = df['Dependencies'].apply(parse_deps)
+    names = df['Activity']
 
     # Basic validation: unique activity names
-    if df['Activity'].duplicated().any():
-        dupes = df.loc[df['Activity'].duplicated(keep=False), 'Activity'].unique().tolist()
+    if names.duplicated().any():
+        dupes = names[names.duplicated(keep=False)].unique().tolist()
         st.error(f"Duplicate Activity IDs found: {', '.join(map(str, dupes))}. Activity names must be unique.")
         return None, None, None
 
-    activities = df['Activity'].tolist()
+    # Struct-of-arrays view of the task table: activities are addressed by row position
+    activities = names.to_numpy()
+    durations = df['Duration (Days)'].to_numpy(np.int32)
+    deps_list = df['Dependencies'].tolist()
+    n = len(activities)
+    idx_of = {a: i for i, a in enumerate(activities)}
+
     # Validate dependencies refer to existing activities
-    all_deps = set(sum(df['Dependencies'].tolist(), []))
-    bad_refs = [d for d in all_deps if d not in activities]
+    all_deps = set(chain.from_iterable(deps_list))
+    bad_refs = [d for d in all_deps if d not in idx_of]
     if bad_refs:
         st.error(f"Dependencies reference unknown activity IDs: {', '.join(bad_refs)}.")
         return None, None, None
 
-    # Build adjacency / in-degree for Kahn's algorithm
-    successors = {a: [] for a in activities}
-    indegree = {a: 0 for a in activities}
-    for _, row in df.iterrows():
-        a = row['Activity']
-        for dep in row['Dependencies']:
-            successors[dep].append(a)
-            indegree[a] += 1
-
-    # Kahn's topological sort
-    queue = [n for n in activities if indegree[n] == 0]
-    topo = []
-    while queue:
-        n = queue.pop(0)
-        topo.append(n)
-        for succ in successors[n]:
-            indegree[succ] -= 1
-            if indegree[succ] == 0:
-                queue.append(succ)
-
-    if len(topo) != len(activities):
+    # CSR adjacency: the predecessors of activity i are
+    # dep_indices[dep_indptr[i]:dep_indptr[i + 1]], and likewise for successors
+    deps_idx = [[idx_of[dep] for dep in deps] for deps in deps_list]
+    dep_counts = np.fromiter((len(deps) for deps in deps_idx), dtype=np.int32, count=n)
+    dep_indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(dep_counts, out=dep_indptr[1:])
+    dep_indices = np.fromiter(chain.from_iterable(deps_idx), dtype=np.int32, count=dep_indptr[-1])
+
+    edge_succ = np.repeat(np.arange(n, dtype=np.int32), dep_counts)
+    succ_indices = edge_succ[np.argsort(dep_indices, kind='stable')]
+    succ_indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(dep_indices, minlength=n), out=succ_indptr[1:])
+
+    es_days, ef_days, ls_days, lf_days, n_sorted = cpm_core(
+        durations, dep_indptr, dep_indices, succ_indptr, succ_indices
+    )
+
+    if n_sorted != n:
         st.error("Cycle detected in dependencies (circular dependency). Please fix task dependencies.")
         return None, None, None
 
-    # Prepare maps for quick lookup
-    row_by_activity = {row['Activity']: row for _, row in df.iterrows()}
-    # datetimes
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-
-    ES_map = {}
-    EF_map = {}
+    start = np.datetime64(start_date, 'D')
+    es = start + es_days
+    ef = start + ef_days
+    ls = start + ls_days
+    lf = start + lf_days
 
-    # Forward pass using topo order
-    for a in topo:
-        row = row_by_activity[a]
-        duration = int(row['Duration (Days)'])
-        deps = row['Dependencies']
-
-        if not deps:
-            es = start_datetime
-        else:
-            # successor ES = max(EF of predecessors) + 1 day (because inclusive EF)
-            max_ef = max(EF_map[dep] for dep in deps)
-            es = max_ef + pd.Timedelta(days=1)
-
-        ef = es + pd.Timedelta(days=duration - 1) if duration > 0 else es  # inclusive convention
-        ES_map[a] = es
-        EF_map[a] = ef
-
-    # Project finish
-    project_finish = max(EF_map.values())
-
-    # Backward pass using reverse topo
-    LF_map = {}
-    LS_map = {}
-
-    for a in reversed(topo):
-        row = row_by_activity[a]
-        duration = int(row['Duration (Days)'])
-        succs = successors[a]
-        if not succs:
-            lf = project_finish
-        else:
-            # LF = min(LS of successors) - 1 day
-            min_succ_ls = min(LS_map[s] for s in succs)
-            lf = min_succ_ls - pd.Timedelta(days=1)
-        ls = lf - pd.Timedelta(days=duration - 1) if duration > 0 else lf
-        LF_map[a] = lf
-        LS_map[a] = ls
+    # Slack and status
+    slack = lf_days - ef_days
+    crit_mask = slack == 0
+    status = np.where(crit_mask, 'Critical', 'Non-Critical')
+    critical_path = activities[crit_mask].tolist()
 
     # Build result DataFrame (with datetimes)
-    df_result = df.copy()
-    df_result['ES'] = df_result['Activity'].map(ES_map)
-    df_result['EF'] = df_result['Activity'].map(EF_map)
-    df_result['LS'] = df_result['Activity'].map(LS_map)
-    df_result['LF'] = df_result['Activity'].map(LF_map)
-
-    # Slack and status
-    df_result['Slack (Days)'] = (df_result['LF'] - df_result['EF']).dt.days
-    df_result['Status'] = df_result['Slack (Days)'].apply(lambda x: 'Critical' if x == 0 else 'Non-Critical')
-    critical_path = df_result[df_result['Status'] == 'Critical']['Activity'].tolist()
+    df_result = pd.DataFrame({
+        'Activity': activities,
+        'Duration (Days)': durations,
+        'Dependencies': deps_list,
+        'ES': es,
+        'EF': ef,
+        'LS': ls,
+        'LF': lf,
+        'Slack (Days)': slack,
+        'Status': status,
+    }, index=df.index)
 
     # Display formatting (string dates)
-    df_display = df_result.copy()
-    for col in ['ES', 'EF', 'LS', 'LF']:
-        df_display[col] = pd.to_datetime(df_display[col]).dt.strftime('%Y-%m-%d')
-    df_display['Dependencies'] = df_display['Dependencies'].apply(lambda x: ', '.join(x))
+    df_display = pd.DataFrame({
+        'Activity': activities,
+        'Duration (Days)': durations,
+        'Dependencies': [', '.join(deps) for deps in deps_list],
+        'ES': np.datetime_as_string(es, unit='D'),
+        'EF': np.datetime_as_string(ef, unit='D'),
+        'LS': np.datetime_as_string(ls, unit='D'),
+        'LF': np.datetime_as_string(lf, unit='D'),
+        'Slack (Days)': slack,
+        'Status': status,
+    }, index=df.index)
 
     return df_display, critical_path, df_result
 
+def _dot_id(name):
+    """Quote an activity name for use as a DOT node ID."""
+    return '"' + str(name).replace('"', '\\"') + '"'
+
 def create_pert_chart(df, critical_path):
-    dot = graphviz.Digraph(format="png")
-    dot.attr(rankdir="LR", bgcolor="white")
+    import graphviz  # deferred: only needed once an analysis has been run
+
+    # Emit the DOT source as text and join it once, rather than paying for a
+    # Digraph.node()/edge() call (with its quoting machinery) per element
+    parts = ['digraph {\n\tgraph [bgcolor=white rankdir=LR]\n']
+    critical_set = set(critical_path)
 
-    for _, row in df.iterrows():
+    # Cast the numeric columns once up front instead of int() per label
+    nodes = df[['Activity', 'ES', 'EF', 'LS', 'LF']].assign(
+        Dur=df['Duration (Days)'].astype(int),
+        Slk=df['Slack (Days)'].astype(int),
+    )
+    for r in nodes.itertuples(index=False):
         label = f"""<
         <TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0" COLOR="black">
-        <TR><TD COLSPAN="2"><B>{row['Activity']}</B></TD></TR>
-        <TR><TD>ES</TD><TD>{row['ES']}</TD></TR>
-        <TR><TD>EF</TD><TD>{row['EF']}</TD></TR>
-        <TR><TD>LS</TD><TD>{row['LS']}</TD></TR>
-        <TR><TD>LF</TD><TD>{row['LF']}</TD></TR>
-        <TR><TD>Dur.</TD><TD>{int(row['Duration (Days)'])}</TD></TR>
-        <TR><TD>Slack</TD><TD>{int(row['Slack (Days)'])}</TD></TR>
+        <TR><TD COLSPAN="2"><B>{escape(r.Activity)}</B></TD></TR>
+        <TR><TD>ES</TD><TD>{r.ES}</TD></TR>
+        <TR><TD>EF</TD><TD>{r.EF}</TD></TR>
+        <TR><TD>LS</TD><TD>{r.LS}</TD></TR>
+        <TR><TD>LF</TD><TD>{r.LF}</TD></TR>
+        <TR><TD>Dur.</TD><TD>{r.Dur}</TD></TR>
+        <TR><TD>Slack</TD><TD>{r.Slk}</TD></TR>
         </TABLE>>"""
-        dot.node(row["Activity"], label=label, shape="plaintext")
+        parts.append(f'\t{_dot_id(r.Activity)} [label={label} shape=plaintext]\n')
 
-    for _, row in df.iterrows():
-        for dep in row["Dependencies"]:
-            dep = dep.strip(', ').strip()
+    for activity, deps in df[['Activity', 'Dependencies']].itertuples(index=False):
+        for dep in deps.split(','):
+            dep = dep.strip()
             if dep:
-                is_critical_edge = (dep in critical_path) and (row["Activity"] in critical_path)
+                is_critical_edge = dep in critical_set and activity in critical_set
                 edge_color = "red" if is_critical_edge else "blue"
-                edge_style = "bold"
-                
-                dot.edge(dep, row["Activity"], color=edge_color, style=edge_style)
+                parts.append(f'\t{_dot_id(dep)} -> {_dot_id(activity)} [color={edge_color} style=bold]\n')
+
+    parts.append('}\n')
+    return graphviz.Source(''.join(parts), format="png")
+
+@st.cache_data(show_spinner=False)
+def render_pert_png(dot_source):
+    """Render the PERT chart DOT source to PNG bytes once per distinct chart.
+    Needs the Graphviz binary, unlike st.graphviz_chart which renders in the browser.
+    """
+    import graphviz
 
-    return dot
+    return graphviz.Source(dot_source).pipe(format='png')
 
+@st.cache_data(show_spinner=False)
 def create_gantt_chart(df, critical_path):
-    df['ES'] = pd.to_datetime(df['ES'])
-    df['EF'] = pd.to_datetime(df['EF'])
-    df['Status'] = df['Activity'].apply(lambda x: 'Critical' if x in critical_path else 'Non-Critical')
+    import plotly.express as px
+
+    # calculate_cpm already hands over datetime columns; only parse when given strings.
+    # All derived columns are attached in one assign() on a new frame.
+    critical_set = set(critical_path)
+    updates = {
+        col: pd.to_datetime(df[col])
+        for col in ['ES', 'EF']
+        if not np.issubdtype(df[col].dtype, np.datetime64)
+    }
+    updates['Status'] = np.where(df['Activity'].isin(critical_set), 'Critical', 'Non-Critical')
+    df = df.assign(**updates)
 
     fig = px.timeline(
         df,
@@ -214,7 +230,7 @@ with col_editor:
         st.session_state.tasks_df,
         num_rows="dynamic",
         width="stretch",
-        key="data_editor_main",
+        key=f"data_editor_{st.session_state.editor_rev}",
         column_config={
             "Activity": st.column_config.TextColumn(required=True),
             "Duration (Days)": st.column_config.NumberColumn(min_value=1, step=1, required=True),
@@ -222,7 +238,7 @@ with col_editor:
         }
     )
 
-    st.session_state.tasks_df = edited_df.copy()
+    st.session_state.tasks_df = edited_df
 
 with col_controls:
     start_date = st.date_input("Project Start Date", value=datetime.today())
@@ -244,13 +260,14 @@ with col_controls:
                 st.error(f"Invalid CSV. Missing required columns: {set(required_cols) - set(imported_df.columns)}")
             else:
                 imported_df = imported_df[required_cols]
-                st.session_state.tasks_df = imported_df.copy()
+                st.session_state.tasks_df = imported_df
+                st.session_state.editor_rev += 1
                 st.success("CSV imported successfully.")
 
                 st.session_state["csv_imported"] = True
                 st.session_state["reset_uploader"] = False
 
-                for key in ['processed_df', 'critical_path', 'gantt_fig']:
+                for key in ['processed_df', 'critical_path', 'gantt_fig', 'csv_bytes', 'gantt_html', 'pert_dot_source', 'pert_png', 'pert_error']:
                     if key in st.session_state:
                         del st.session_state[key]
 
@@ -261,7 +278,8 @@ with col_controls:
         
     if st.button("🗑️ Clear All Data", type="secondary", width="stretch"):
         st.session_state.tasks_df = pd.DataFrame(columns=["Activity", "Duration (Days)", "Dependencies"])
-        for key in ['processed_df', 'critical_path', 'gantt_fig', 'csv_imported']:
+        st.session_state.editor_rev += 1
+        for key in ['processed_df', 'critical_path', 'gantt_fig', 'csv_bytes', 'gantt_html', 'pert_dot_source', 'pert_png', 'pert_error', 'csv_imported']:
             if key in st.session_state:
                 del st.session_state[key]
         
@@ -275,8 +293,7 @@ if st.button("Run Schedule Analysis", type="primary", width="stretch", help="Cli
     if st.session_state.tasks_df.empty or st.session_state.tasks_df['Activity'].isnull().all():
         st.warning("No task data found. Please enter some tasks first.")
     else:
-        df = st.session_state.tasks_df.copy()
-        df = df.dropna(subset=['Activity'])
+        df = _normalize_tasks(st.session_state.tasks_df)
 
         with st.spinner("Calculating project schedule..."):
             processed_df, critical_path, gantt_df = calculate_cpm(df, start_date)
@@ -285,9 +302,26 @@ if st.button("Run Schedule Analysis", type="primary", width="stretch", help="Cli
                 st.session_state.processed_df = processed_df
                 st.session_state.critical_path = critical_path
                 st.session_state.gantt_fig = create_gantt_chart(gantt_df, critical_path)
+
+                # Serialize the downloads once here instead of on every rerun of the results tabs
+                st.session_state.csv_bytes = processed_df.to_csv(index=False).encode('utf-8')
+                st.session_state.gantt_html = st.session_state.gantt_fig.to_html()
+
+                # Build the PERT chart once here; tab2 only reads the stored source/PNG.
+                # Only the PNG export needs the Graphviz binary, so a failed render
+                # still leaves the in-browser chart available.
+                for key in ['pert_dot_source', 'pert_png', 'pert_error']:
+                    st.session_state.pop(key, None)
+                if critical_path:
+                    st.session_state.pert_dot_source = create_pert_chart(processed_df, critical_path).source
+                    try:
+                        st.session_state.pert_png = render_pert_png(st.session_state.pert_dot_source)
+                    except Exception as e:
+                        st.session_state.pert_error = str(e)
+
                 st.success("Schedule analysis completed!")
             else:
-                for key in ['processed_df', 'critical_path', 'gantt_fig']:
+                for key in ['processed_df', 'critical_path', 'gantt_fig', 'csv_bytes', 'gantt_html', 'pert_dot_source', 'pert_png', 'pert_error']:
                     if key in st.session_state:
                         del st.session_state[key]
 
@@ -302,31 +336,28 @@ if 'processed_df' in st.session_state:
         df_display = st.session_state.processed_df
         st.dataframe(df_display, width="stretch", hide_index=True)
 
-        csv_data = df_display.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="📥 Download CPM Results (CSV)",
-            data=csv_data,
+            data=st.session_state.csv_bytes,
             file_name="project_cpm_results.csv",
             mime="text/csv",
         )
 
     with tab2:
         st.header("PERT Chart")
-        if st.session_state.critical_path:
-            try:
-                dot = create_pert_chart(st.session_state.processed_df, st.session_state.critical_path)
-                st.graphviz_chart(dot, width="content")
-                
-                png_data = dot.pipe(format='png')
+        if 'pert_dot_source' in st.session_state:
+            st.graphviz_chart(st.session_state.pert_dot_source, width="content")
+
+            if 'pert_png' in st.session_state:
                 st.download_button(
                     label="📥 Download PERT Chart (PNG)",
-                    data=png_data,
+                    data=st.session_state.pert_png,
                     file_name="project_pert_chart.png",
                     mime="image/png",
                     width="content"
                 )
-            except Exception as e:
-                st.error(f"Failed to create the chart: {e}")
+            else:
+                st.error(f"Failed to create the chart: {st.session_state.pert_error}")
         else:
             st.warning("No PERT Chart found.")
 
@@ -335,10 +366,9 @@ if 'processed_df' in st.session_state:
         st.info("Hover over bars for details. Use the toolbar at the top-right to zoom, pan, or download as a PNG.")
         st.plotly_chart(st.session_state.gantt_fig, width="stretch")
 
-        html_data = st.session_state.gantt_fig.to_html()
         st.download_button(
             label="📤 Download Gantt Chart (HTML)",
-            data=html_data,
+            data=st.session_state.gantt_html,
             file_name="project_gantt_chart.html",
             mime="text/html",
         )
\ No newline at end of file
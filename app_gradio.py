@@ -1,31 +1,79 @@
-import plotly.graph_objects as go
 from datetime import datetime
-import plotly.express as px
+from html import escape
 import pandas as pd
-import graphviz
+import numpy as np
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import shutil
+import atexit
+import threading
 import gradio as gr
 
+# Kategori Status: kode 0 = Non-Critical, 1 = Critical (sama dengan mask slack == 0)
+STATUS_CATEGORIES = ['Non-Critical', 'Critical']
+
+# Cache struktur graf dari pemanggilan terakhir calculate_cpm
+_graph_cache = {'key': None, 'graph': None}
+
+def _csr(src, dst, n):
+    """
+    Menyusun edge (src[k] -> dst[k]) menjadi CSR: tetangga node i adalah
+    indices[indptr[i]:indptr[i + 1]], urutan edge asli dipertahankan (stable sort).
+    """
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    indices = dst[np.argsort(src, kind='stable')]
+    return indptr, indices
+
+def _build_graph(df, activity_to_idx):
+    """
+    Membangun array CSR predecessor/successor dari kolom Dependencies (sudah berupa list).
+    Mengembalikan: (pred_ptr, pred_idx, succ_ptr, succ_idx, edges) dengan edges berupa
+    list (predecessor, successor).
+    """
+    n = len(activity_to_idx)
+
+    # Tabel edge bentuk panjang (satu baris per dependensi) via explode, tanpa loop iterrows
+    edges = df[['Activity', 'Dependencies']].explode('Dependencies').dropna()
+    edges.columns = ['succ', 'pred']
+
+    # Validasi dependensi merujuk ke aktivitas yang ada
+    bad_refs = edges.loc[~edges['pred'].isin(activity_to_idx.keys()), 'pred'].unique().tolist()
+    if bad_refs:
+        raise gr.Error(f"Dependency refers to an unknown activity ID: {', '.join(bad_refs)}.")
+
+    # Ratakan dependensi ke array CSR: predecessor dari aktivitas i adalah
+    # pred_idx[pred_ptr[i]:pred_ptr[i + 1]], successor disusun dengan cara yang sama
+    edge_pred = edges['pred'].map(activity_to_idx).to_numpy(np.int64)
+    edge_succ = edges['succ'].map(activity_to_idx).to_numpy(np.int64)
+    pred_ptr, pred_idx = _csr(edge_succ, edge_pred, n)
+    succ_ptr, succ_idx = _csr(edge_pred, edge_succ, n)
+
+    return pred_ptr, pred_idx, succ_ptr, succ_idx, list(zip(edges['pred'], edges['succ']))
+
 def calculate_cpm(df, start_date):
     """
     Menghitung CPM menggunakan explicit topological sort (Kahn). 
-    Mengembalikan: (df_display, critical_path, df_with_datetimes)
+    Mengembalikan: (df_display, critical_path, df_with_datetimes, edges)
+    dengan edges berupa list (predecessor, successor).
     Modifikasi: st.error diganti dengan raise gr.Error
     """
-    # Pastikan input
-    df = df.copy()
-    df['Duration (Days)'] = pd.to_numeric(df['Duration (Days)'], errors='coerce').fillna(1).astype(int)
-    df['Dependencies'] = df['Dependencies'].fillna('')
-
-    # Normalisasi nama Aktivitas (strip) dan Dependensi menjadi list (strip setiap)
-    df['Activity'] = df['Activity'].astype(str).str.strip()
     def parse_deps(x):
         if pd.isna(x) or str(x).strip() == '':
             return []
         # split dengan koma dan strip setiap token, abaikan yang kosong
         parts = [p.strip() for p in str(x).split(',')]
         return [p for p in parts if p != '']
-    df['Dependencies'] = df['Dependencies'].apply(parse_deps)
+
+    # Pastikan input, normalisasi nama Aktivitas (strip) dan Dependensi menjadi list (strip setiap).
+    # assign membuat frame baru hanya dengan kolom yang diganti, tanpa deep copy seluruh tabel.
+    df = df.assign(**{
+        'Activity': df['Activity'].astype(str).str.strip(),
+        'Duration (Days)': pd.to_numeric(df['Duration (Days)'], errors='coerce').fillna(1).astype(int),
+        'Dependencies': df['Dependencies'].apply(parse_deps),
+    })
 
     # Validasi dasar: nama aktivitas unik
     if df['Activity'].duplicated().any():
@@ -33,154 +81,216 @@ def calculate_cpm(df, start_date):
         raise gr.Error(f"Duplicate Activity ID found: {', '.join(map(str, dupes))}. Activity names must be unique.")
 
     activities = df['Activity'].tolist()
-    # Validasi dependensi merujuk ke aktivitas yang ada
-    all_deps = set(sum(df['Dependencies'].tolist(), []))
-    bad_refs = [d for d in all_deps if d not in activities]
-    if bad_refs:
-        raise gr.Error(f"Dependency refers to an unknown activity ID: {', '.join(bad_refs)}.")
-
-    # Bangun adjacency / in-degree untuk algoritma Kahn
-    successors = {a: [] for a in activities}
-    indegree = {a: 0 for a in activities}
-    for _, row in df.iterrows():
-        a = row['Activity']
-        for dep in row['Dependencies']:
-            successors[dep].append(a)
-            indegree[a] += 1
-
-    # Kahn's topological sort
-    queue = [n for n in activities if indegree[n] == 0]
-    topo = []
-    while queue:
-        n = queue.pop(0)
-        topo.append(n)
-        for succ in successors[n]:
-            indegree[succ] -= 1
-            if indegree[succ] == 0:
-                queue.append(succ)
-
-    if len(topo) != len(activities):
+    n = len(activities)
+    activity_to_idx = {a: i for i, a in enumerate(activities)}
+    dur = df['Duration (Days)'].to_numpy(np.int64)
+
+    # Struktur graf (CSR) hanya dibangun ulang jika aktivitas atau dependensi berubah;
+    # edit yang hanya mengubah durasi langsung menjalankan ulang kernel CPM
+    graph_key = (tuple(activities), tuple(map(tuple, df['Dependencies'])))
+    if _graph_cache['key'] != graph_key:
+        _graph_cache['graph'] = _build_graph(df, activity_to_idx)
+        _graph_cache['key'] = graph_key
+    pred_ptr, pred_idx, succ_ptr, succ_idx, edge_list = _graph_cache['graph']
+
+    # Kahn's topological sort + forward/backward pass dalam kernel Numba (cpm_kernel.py).
+    # Diimpor di sini karena import numba adalah biaya start-up terbesar.
+    from cpm_kernel import cpm_core
+    es, ef, ls, lf, n_sorted = cpm_core(dur, pred_ptr, pred_idx, succ_ptr, succ_idx)
+
+    if n_sorted != n:
         raise gr.Error("A cycle has been detected in the dependencies (circular dependencies). Please fix the task dependencies.")
 
-    # Siapkan map untuk pencarian cepat
-    row_by_activity = {row['Activity']: row for _, row in df.iterrows()}
-    # datetimes
+    # Konversi ke datetime sekali di akhir
     start_datetime = datetime.combine(start_date, datetime.min.time())
 
-    ES_map = {}
-    EF_map = {}
-
-    # Forward pass menggunakan urutan topo
-    for a in topo:
-        row = row_by_activity[a]
-        duration = int(row['Duration (Days)'])
-        deps = row['Dependencies']
-
-        if not deps:
-            es = start_datetime
-        else:
-            # successor ES = max(EF dari predecessors) + 1 hari (karena EF inklusif)
-            max_ef = max(EF_map[dep] for dep in deps)
-            es = max_ef + pd.Timedelta(days=1)
-
-        ef = es + pd.Timedelta(days=duration - 1) if duration > 0 else es  # konvensi inklusif
-        ES_map[a] = es
-        EF_map[a] = ef
-
-    # Project finish
-    project_finish = max(EF_map.values())
-
-    # Backward pass menggunakan reverse topo
-    LF_map = {}
-    LS_map = {}
-
-    for a in reversed(topo):
-        row = row_by_activity[a]
-        duration = int(row['Duration (Days)'])
-        succs = successors[a]
-        if not succs:
-            lf = project_finish
-        else:
-            # LF = min(LS dari successors) - 1 hari
-            min_succ_ls = min(LS_map[s] for s in succs)
-            lf = min_succ_ls - pd.Timedelta(days=1)
-        ls = lf - pd.Timedelta(days=duration - 1) if duration > 0 else lf
-        LF_map[a] = lf
-        LS_map[a] = ls
-
-    # Bangun DataFrame hasil (dengan datetimes)
-    df_result = df.copy()
-    df_result['ES'] = df_result['Activity'].map(ES_map)
-    df_result['EF'] = df_result['Activity'].map(EF_map)
-    df_result['LS'] = df_result['Activity'].map(LS_map)
-    df_result['LF'] = df_result['Activity'].map(LF_map)
-
-    # Slack dan status
-    df_result['Slack (Days)'] = (df_result['LF'] - df_result['EF']).dt.days
-    df_result['Status'] = df_result['Slack (Days)'].apply(lambda x: 'Critical' if x == 0 else 'Non-Critical')
-    critical_path = df_result[df_result['Status'] == 'Critical']['Activity'].tolist()
-
-    # Format tampilan (string tanggal)
-    df_display = df_result.copy()
-    for col in ['ES', 'EF', 'LS', 'LF']:
-        df_display[col] = pd.to_datetime(df_display[col]).dt.strftime('%Y-%m-%d')
-    df_display['Dependencies'] = df_display['Dependencies'].apply(lambda x: ', '.join(x))
-
-    return df_display, critical_path, df_result
-
-def create_pert_chart(df, critical_path):
-    dot = graphviz.Digraph(format="png")
-    dot.attr(rankdir="LR", bgcolor="white")
-
-    for _, row in df.iterrows():
-        label = f"""<
-        <TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0" COLOR="black">
-        <TR><TD COLSPAN="2"><B>{row['Activity']}</B></TD></TR>
-        <TR><TD>ES</TD><TD>{row['ES']}</TD></TR>
-        <TR><TD>EF</TD><TD>{row['EF']}</TD></TR>
-        <TR><TD>LS</TD><TD>{row['LS']}</TD></TR>
-        <TR><TD>LF</TD><TD>{row['LF']}</TD></TR>
-        <TR><TD>Dur.</TD><TD>{int(row['Duration (Days)'])}</TD></TR>
-        <TR><TD>Slack</TD><TD>{int(row['Slack (Days)'])}</TD></TR>
-        </TABLE>>"""
-        dot.node(row["Activity"], label=label, shape="plaintext")
-
-    for _, row in df.iterrows():
-        deps_list = [d.strip() for d in row["Dependencies"].split(',') if d.strip()]
-        for dep in deps_list:
-            if dep:
-                is_critical_edge = (dep in critical_path) and (row["Activity"] in critical_path)
-                edge_color = "red" if is_critical_edge else "blue"
-                edge_style = "bold"
-                
-                dot.edge(dep, row["Activity"], color=edge_color, style=edge_style)
-
-    return dot
+    # Bangun DataFrame hasil (dengan datetimes). Activity disimpan sebagai kategori berurutan
+    # (kode int = posisi baris, nama sudah dijamin unik) sehingga isin/groupby bekerja atas kode integer.
+    df_result = df.assign(
+        Activity=pd.Categorical.from_codes(np.arange(n), categories=activities, ordered=True),
+        ES=start_datetime + pd.to_timedelta(es, unit='D'),
+        EF=start_datetime + pd.to_timedelta(ef, unit='D'),
+        LS=start_datetime + pd.to_timedelta(ls, unit='D'),
+        LF=start_datetime + pd.to_timedelta(lf, unit='D'),
+    )
+
+    # Slack dan status langsung dari array hari integer, tanpa .dt.days atas kolom datetime
+    slack = lf - ef
+    crit_mask = slack == 0
+    df_result['Slack (Days)'] = slack
+    df_result['Status'] = pd.Categorical.from_codes(crit_mask.astype(np.int8), categories=STATUS_CATEGORIES)
+    critical_path = df_result['Activity'].to_numpy()[crit_mask].tolist()
+
+    # Format tampilan (string tanggal), langsung dari offset hari tanpa parsing ulang datetime
+    start_day = np.datetime64(start_date, 'D')
+    df_display = df_result.assign(
+        Dependencies=df_result['Dependencies'].str.join(', '),
+        ES=np.datetime_as_string(start_day + es, unit='D'),
+        EF=np.datetime_as_string(start_day + ef, unit='D'),
+        LS=np.datetime_as_string(start_day + ls, unit='D'),
+        LF=np.datetime_as_string(start_day + lf, unit='D'),
+    )
+
+    return df_display, critical_path, df_result, edge_list
+
+# Label HTML node PERT dalam satu baris (tanpa whitespace yang harus di-tokenize Graphviz).
+# Nama aktivitas di-escape (&, <, >) sebelum dimasukkan ke label HTML.
+NODE_TMPL = (
+    '<<TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0" COLOR="black">'
+    '<TR><TD COLSPAN="2"><B>{a}</B></TD></TR>'
+    '<TR><TD>ES</TD><TD>{es}</TD></TR><TR><TD>EF</TD><TD>{ef}</TD></TR>'
+    '<TR><TD>LS</TD><TD>{ls}</TD></TR><TR><TD>LF</TD><TD>{lf}</TD></TR>'
+    '<TR><TD>Dur.</TD><TD>{dur}</TD></TR><TR><TD>Slack</TD><TD>{slack}</TD></TR>'
+    '</TABLE>>'
+)
+
+def _dot_id(name):
+    """Quote nama aktivitas untuk dipakai sebagai ID node DOT."""
+    return '"' + str(name).replace('"', '\\"') + '"'
+
+def create_pert_chart(df, critical_path, edges):
+    """
+    Menyusun source DOT diagram PERT sebagai satu string (tanpa API Digraph yang
+    meng-escape ulang setiap argumen). Mengembalikan string source DOT.
+    """
+    lines = ['digraph G {', 'rankdir=LR; bgcolor=white;']
+
+    # Ambil setiap kolom sekali sebagai array (angka di-cast sekali), lalu iterasi posisi
+    columns = (
+        df['Activity'].to_numpy(),
+        df['ES'].to_numpy(),
+        df['EF'].to_numpy(),
+        df['LS'].to_numpy(),
+        df['LF'].to_numpy(),
+        df['Duration (Days)'].to_numpy(dtype=int),
+        df['Slack (Days)'].to_numpy(dtype=int),
+    )
+    for a, es, ef, ls, lf, dur, slack in zip(*columns):
+        label = NODE_TMPL.format(a=escape(a), es=es, ef=ef, ls=ls, lf=lf, dur=dur, slack=slack)
+        lines.append(f'{_dot_id(a)} [label={label} shape=plaintext];')
+
+    # Edge diambil dari tabel edge calculate_cpm, tanpa memecah ulang string Dependencies
+    crit_set = set(critical_path)
+    for pred, succ in edges:
+        is_critical_edge = pred in crit_set and succ in crit_set
+        edge_color = "red" if is_critical_edge else "blue"
+        lines.append(f'{_dot_id(pred)} -> {_dot_id(succ)} [color={edge_color} style=bold];')
+
+    lines.append('}')
+    return '\n'.join(lines)
+
+# ----------------------------------------------------------------------------
+# CACHE ARTEFAK EKSPOR
+# ----------------------------------------------------------------------------
+# Direktori artefak yang bertahan selama proses berjalan; nama file diturunkan dari
+# hash isi sehingga input yang sama memakai ulang file yang sudah dirender
+_ARTIFACT_DIR = tempfile.mkdtemp(prefix="project_scheduler_")
+atexit.register(shutil.rmtree, _ARTIFACT_DIR, ignore_errors=True)
+
+# Hanya beberapa hasil terakhir yang disimpan di disk (urutan lama -> baru)
+_MAX_ARTIFACT_KEYS = 4
+_artifact_keys = []
+
+# Input, key artefak dan output run_analysis terakhir yang berhasil
+_last_run = {'key': None, 'artifact_key': None, 'result': None}
+
+def _retain_artifact_key(key):
+    """
+    Tandai key sebagai yang terbaru dan hapus direktori key terlama di luar batas.
+    Direktori yang dirujuk _last_run tidak pernah dihapus agar hasil memo tetap valid.
+    """
+    if key in _artifact_keys:
+        _artifact_keys.remove(key)
+    _artifact_keys.append(key)
+    protected = {key, _last_run['artifact_key']}
+    excess = len(_artifact_keys) - _MAX_ARTIFACT_KEYS
+    for old_key in [k for k in _artifact_keys if k not in protected][:max(excess, 0)]:
+        _artifact_keys.remove(old_key)
+        shutil.rmtree(os.path.join(_ARTIFACT_DIR, old_key), ignore_errors=True)
+
+def _artifact_key(df_display):
+    """
+    Hash isi tabel hasil CPM. Diagram PERT dan Gantt sepenuhnya diturunkan dari tabel ini
+    (termasuk kolom Status), jadi hash ini cukup sebagai kunci cache keduanya.
+    """
+    row_hashes = pd.util.hash_pandas_object(df_display, index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+def _cached_artifact(key, filename, write):
+    """
+    Mengembalikan path artefak `filename` untuk key ini. `write(path)` hanya dipanggil jika
+    file belum ada; ditulis ke file sementara lalu di-rename agar tidak pernah setengah jadi.
+    """
+    key_dir = os.path.join(_ARTIFACT_DIR, key)
+    path = os.path.join(key_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(key_dir, exist_ok=True)
+        tmp_path = os.path.join(key_dir, f"tmp_{filename}")
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+def _write_pert_png(dot_source, path):
+    # Graphviz menulis PNG langsung ke disk; byte gambar tidak melewati memori Python
+    import graphviz
+    graphviz.Source(dot_source, format='png').render(outfile=path, format='png', cleanup=True)
+
+def _write_gantt_html(fig, path):
+    # Plotly.js (~3 MB) dimuat dari CDN, bukan disematkan ke setiap file ekspor.
+    # Figure dibangun sendiri oleh create_gantt_chart, jadi validasi skema bisa dilewati.
+    fig.write_html(path, include_plotlyjs='cdn', full_html=True, include_mathjax=False, validate=False)
 
 def create_gantt_chart(df, critical_path):
+    # Import di dalam fungsi: plotly hanya dibutuhkan saat analisis dijalankan, bukan saat start-up
+    import plotly.graph_objects as go
+
     df['ES'] = pd.to_datetime(df['ES']).dt.normalize()
     df['EF'] = pd.to_datetime(df['EF']).dt.normalize()
-    df['Status'] = df['Activity'].apply(lambda x: 'Critical' if x in critical_path else 'Non-Critical')
-
-    fig = px.timeline(
-        df,
-        x_start="ES",
-        x_end="EF",
-        y="Activity",
-        color="Status",
-        title="Project Gantt Chart",
-        color_discrete_map={
-            'Critical': 'rgb(230, 0, 0)',
-            'Non-Critical': 'rgb(0, 110, 255)'
-        },
-        hover_data=["Duration (Days)", "ES", "EF", "LS", "LF", "Slack (Days)"]
+    crit_set = set(critical_path)
+    df['Status'] = pd.Categorical.from_codes(df['Activity'].isin(crit_set).to_numpy(np.int8), categories=STATUS_CATEGORIES)
+
+    # Bangun trace go.Bar langsung dari array (tanpa lapisan introspeksi plotly.express).
+    # Sumbu x bertipe tanggal: base = ES, panjang bar dalam milidetik; EF inklusif sehingga +1 hari.
+    width_ms = (df['EF'] - df['ES'] + pd.Timedelta(days=1)) // pd.Timedelta(milliseconds=1)
+    customdata = np.column_stack([
+        df['Duration (Days)'].to_numpy(),
+        df['ES'].dt.strftime('%Y-%m-%d').to_numpy(),
+        df['EF'].dt.strftime('%Y-%m-%d').to_numpy(),
+        df['LS'].dt.strftime('%Y-%m-%d').to_numpy(),
+        df['LF'].dt.strftime('%Y-%m-%d').to_numpy(),
+        df['Slack (Days)'].to_numpy(),
+    ])
+    hovertemplate = (
+        "Activity=%{y}<br>Duration (Days)=%{customdata[0]}<br>ES=%{customdata[1]}<br>EF=%{customdata[2]}"
+        "<br>LS=%{customdata[3]}<br>LF=%{customdata[4]}<br>Slack (Days)=%{customdata[5]}<extra></extra>"
     )
-
+    colors = {'Critical': 'rgb(230, 0, 0)', 'Non-Critical': 'rgb(0, 110, 255)'}
+
+    fig = go.Figure()
+    for status, color in colors.items():
+        mask = (df['Status'] == status).to_numpy()
+        if not mask.any():
+            continue
+        fig.add_trace(go.Bar(
+            name=status,
+            y=df['Activity'].to_numpy()[mask],
+            x=width_ms.to_numpy()[mask],
+            base=df['ES'].to_numpy()[mask],
+            orientation='h',
+            marker_color=color,
+            customdata=customdata[mask],
+            hovertemplate=hovertemplate,
+        ))
+
+    fig.update_xaxes(type="date")
+    fig.update_yaxes(categoryorder="array", categoryarray=df['Activity'].tolist())
     fig.update_yaxes(autorange="reversed")
     fig.update_layout(
         xaxis_title="Timeline",
         yaxis_title="Activity",
+        title="Project Gantt Chart",
         legend_title="Task Type",
+        barmode="overlay",
         hovermode="x unified"
     )
     return fig
@@ -196,31 +306,48 @@ def run_analysis(tasks_df, start_date_str):
     """
     if tasks_df is None or tasks_df.empty or tasks_df['Activity'].isnull().all():
         raise gr.Error("No task data found. Please enter some tasks first.")
+
+    # Klik ulang dengan tabel dan tanggal yang sama langsung memakai hasil sebelumnya;
+    # file yang dirujuk tetap ada karena tersimpan di _ARTIFACT_DIR
+    run_key = hashlib.blake2b(
+        pd.util.hash_pandas_object(tasks_df, index=False).to_numpy().tobytes() + str(start_date_str).encode(),
+        digest_size=16,
+    ).digest()
+    if _last_run['key'] == run_key:
+        return _last_run['result']
     
     try:
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        df = tasks_df.copy().dropna(subset=['Activity'])
-        df['Dependencies'] = df['Dependencies'].fillna('')
+        df = tasks_df.dropna(subset=['Activity'])
     except Exception as e:
         raise gr.Error(f"Invalid input: {e}")
 
-    df_display, critical_path, gantt_df = calculate_cpm(df, start_date)
+    df_display, critical_path, gantt_df, edges = calculate_cpm(df, start_date)
     gantt_fig = create_gantt_chart(gantt_df, critical_path)
-    dot = create_pert_chart(df_display, critical_path)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as f_png:
-        f_png.write(dot.pipe(format='png'))
-        pert_chart_path = f_png.name
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as f_csv:
-        df_display.to_csv(f_csv.name, index=False, encoding='utf-8')
-        csv_download_path = f_csv.name
+    dot_source = create_pert_chart(df_display, critical_path, edges)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as f_html:
-        gantt_fig.write_html(f_html.name)
-        gantt_download_path = f_html.name
+    # PNG PERT (subprocess Graphviz) dan HTML Gantt hanya dirender ulang jika hasilnya berubah.
+    # Ketiga artefak saling independen, jadi ditulis paralel: proses dot berjalan
+    # selagi Plotly menyerialisasi HTML. Exception dari worker muncul lagi di .result().
+    # Key baru hanya didaftarkan (dan key lama hanya dihapus) setelah ketiga artefak berhasil;
+    # direktori dari render yang gagal dibuang agar tidak tertinggal tanpa pemilik.
+    key = _artifact_key(df_display)
 
-    return (
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            f_png = executor.submit(_cached_artifact, key, "project_pert_chart.png", lambda path: _write_pert_png(dot_source, path))
+            f_html = executor.submit(_cached_artifact, key, "project_gantt_chart.html", lambda path: _write_gantt_html(gantt_fig, path))
+            f_csv = executor.submit(_cached_artifact, key, "cpm_results.csv", lambda path: df_display.to_csv(path, index=False, encoding='utf-8'))
+            pert_chart_path = f_png.result()
+            gantt_download_path = f_html.result()
+            csv_download_path = f_csv.result()
+    except Exception:
+        if key not in _artifact_keys:
+            shutil.rmtree(os.path.join(_ARTIFACT_DIR, key), ignore_errors=True)
+        raise
+    _retain_artifact_key(key)
+
+    result = (
         df_display,           # Output ke cpm_table
         pert_chart_path,      # Output ke pert_chart_img
         gantt_fig,            # Output ke gantt_chart_plot
@@ -228,6 +355,8 @@ def run_analysis(tasks_df, start_date_str):
         gr.File(pert_chart_path, label="Download PERT Chart (PNG)"),
         gr.File(gantt_download_path, label="Download Gantt Chart (HTML)")
     )
+    _last_run.update(key=run_key, artifact_key=key, result=result)
+    return result
 
 def load_from_csv(file_obj):
     """
@@ -236,13 +365,15 @@ def load_from_csv(file_obj):
     if file_obj is None:
         raise gr.Error("File not found.")
     try:
-        imported_df = pd.read_csv(file_obj.name)
         required_cols = ['Activity', 'Duration (Days)', 'Dependencies']
+        # Baca header saja dulu agar pesan kolom yang hilang tetap spesifik
+        header_cols = pd.read_csv(file_obj.name, nrows=0).columns
 
-        if not all(col in imported_df.columns for col in required_cols):
-            raise gr.Error(f"Invalid CSV. Required columns are missing: {set(required_cols) - set(imported_df.columns)}")
-        
-        imported_df = imported_df[required_cols]
+        if not all(col in header_cols for col in required_cols):
+            raise gr.Error(f"Invalid CSV. Required columns are missing: {set(required_cols) - set(header_cols)}")
+
+        # Parser CSV multithread PyArrow, hanya kolom yang dibutuhkan yang di-parse
+        imported_df = pd.read_csv(file_obj.name, engine='pyarrow', usecols=required_cols)
         imported_df['Dependencies'] = imported_df['Dependencies'].fillna('')
         
         gr.Info("Successfully imported CSV.")
@@ -351,5 +482,23 @@ with gr.Blocks(title="Project Scheduler", theme=gr.themes.Soft()) as demo:
         outputs=[tasks_editor] + all_outputs
     )
 
+def _prewarm_imports():
+    """
+    Memuat plotly, graphviz dan kernel CPM di background agar klik Run pertama tidak
+    menunggu import maupun kompilasi JIT Numba.
+    """
+    import plotly.graph_objects  # noqa: F401
+    import graphviz  # noqa: F401
+    from cpm_kernel import cpm_core
+
+    # Satu aktivitas tanpa dependensi, dengan tipe array yang sama seperti calculate_cpm
+    # (durasi lewat to_numpy() pandas, yang bisa read-only), agar spesialisasi yang
+    # dipakai saat Run sudah dikompilasi (atau dimuat dari cache)
+    dur = pd.Series([1]).to_numpy(np.int64)
+    ptr = np.zeros(2, dtype=np.int64)
+    idx = np.zeros(0, dtype=np.int64)
+    cpm_core(dur, ptr, idx, ptr, idx)
+
 if __name__ == "__main__":
+    threading.Thread(target=_prewarm_imports, daemon=True).start()
     demo.launch()
\ No newline at end of file
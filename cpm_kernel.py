@@ -0,0 +1,69 @@
+"""Numba-compiled CPM kernel shared by the Streamlit and Gradio apps.
+
+Kept in its own module so the compiled function is built once per process
+instead of on every Streamlit script rerun.
+"""
+from numba import njit
+import numpy as np
+
+
+@njit(cache=True)
+def cpm_core(durations, dep_indptr, dep_indices, succ_indptr, succ_indices):
+    """Kahn's topological sort plus CPM forward/backward passes on CSR arrays.
+    Dates are integer day offsets from the project start (day 0). Returns:
+        (es, ef, ls, lf, n_sorted) -- n_sorted < len(durations) means a cycle
+    """
+    n = durations.shape[0]
+    indegree = dep_indptr[1:] - dep_indptr[:-1]
+    queue = np.empty(n, dtype=np.int32)
+    head = 0
+    tail = 0
+    for i in range(n):
+        if indegree[i] == 0:
+            queue[tail] = i
+            tail += 1
+
+    es = np.zeros(n, dtype=np.int32)
+    ef = np.zeros(n, dtype=np.int32)
+    ls = np.zeros(n, dtype=np.int32)
+    lf = np.zeros(n, dtype=np.int32)
+
+    # Forward pass folded into the sort: every predecessor of a node is
+    # finished by the time its in-degree drops to zero.
+    while head < tail:
+        i = queue[head]
+        head += 1
+
+        # successor ES = max(EF of predecessors) + 1 day (because inclusive EF)
+        start = 0
+        for k in range(dep_indptr[i], dep_indptr[i + 1]):
+            start = max(start, ef[dep_indices[k]] + 1)
+        es[i] = start
+        ef[i] = start + max(durations[i] - 1, 0)  # inclusive convention
+
+        for k in range(succ_indptr[i], succ_indptr[i + 1]):
+            succ = succ_indices[k]
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue[tail] = succ
+                tail += 1
+
+    if tail < n or n == 0:
+        return es, ef, ls, lf, tail
+
+    # Backward pass using reverse topo
+    project_finish = ef.max()
+    for j in range(n - 1, -1, -1):
+        i = queue[j]
+        if succ_indptr[i] == succ_indptr[i + 1]:
+            finish = project_finish
+        else:
+            # LF = min(LS of successors) - 1 day
+            finish = ls[succ_indices[succ_indptr[i]]]
+            for k in range(succ_indptr[i] + 1, succ_indptr[i + 1]):
+                finish = min(finish, ls[succ_indices[k]])
+            finish -= 1
+        lf[i] = finish
+        ls[i] = finish - max(durations[i] - 1, 0)
+
+    return es, ef, ls, lf, tail